@@ -3,23 +3,41 @@ from typing import List, Dict
 
 import streamlit as st
 
-from mosdac_bot.qa_engine import QABot
-
 
 # ------------------------
 # Placeholder Answer Engine
 # ------------------------
 
-# Initialise QABot singleton and cache with Streamlit
-@st.cache_resource(allow_output_mutation=True)
-def _load_qa_bot():
+NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "vector_index")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+# Shared with build_vector_index.py; set EMBEDDING_CACHE= (empty) to disable
+EMBEDDING_CACHE = os.getenv("EMBEDDING_CACHE", "embedding_cache.sqlite") or None
+
+
+# Initialise QABot singleton and cache with Streamlit (shared across reruns and sessions)
+@st.cache_resource
+def _load_qa_bot(
+    neo4j_uri: str,
+    neo4j_user: str,
+    neo4j_password: str | None,
+    vector_index_dir: str,
+    openai_model: str,
+    embedding_cache: str | None,
+):
+    # Imported here so the page renders before LangChain/FAISS are loaded
+    from mosdac_bot.qa_engine import QABot
+
     try:
         bot = QABot(
-            neo4j_uri=os.getenv("NEO4J_URI", "bolt://localhost:7687"),
-            neo4j_user=os.getenv("NEO4J_USER", "neo4j"),
-            neo4j_password=os.getenv("NEO4J_PASSWORD"),
-            vector_index_dir=os.getenv("VECTOR_INDEX_DIR", "vector_index"),
-            openai_model=os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
+            neo4j_uri=neo4j_uri,
+            neo4j_user=neo4j_user,
+            neo4j_password=neo4j_password,
+            vector_index_dir=vector_index_dir,
+            openai_model=openai_model,
+            embedding_cache=embedding_cache,
         )
         return bot
     except Exception as e:
@@ -28,7 +46,7 @@ def _load_qa_bot():
 
 
 def get_answer(question: str, chat_history: List[Dict[str, str]]) -> str:
-    qa_bot = _load_qa_bot()
+    qa_bot = _load_qa_bot(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, VECTOR_INDEX_DIR, OPENAI_MODEL, EMBEDDING_CACHE)
     return qa_bot.answer(question, chat_history)
 
 
@@ -1,51 +1,324 @@
 import argparse
+import hashlib
+import json
 import logging
+import math
 import os
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Tuple
 
+import faiss
+import numpy as np
 import openai
+import tiktoken
+from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain.docstore.document import Document
 from neo4j import GraphDatabase
 from tqdm import tqdm
 
+from mosdac_bot.embedding_cache import CachedEmbeddings
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
 logger = logging.getLogger("vector_index_builder")
 
+# OpenAI caps an embeddings request at 2048 inputs and a per-request token budget.
+EMBED_BATCH_SIZE = 1000
+EMBED_BATCH_TOKENS = 250_000
 
-def fetch_sections(uri: str, user: str, password: str, limit: int | None = None) -> List[Document]:
-    """Fetch Section nodes from Neo4j and map them to LangChain Documents."""
+# Records pulled per Bolt round-trip while streaming sections (driver default is 1000)
+NEO4J_FETCH_SIZE = 5000
+
+# IVF-PQ needs enough vectors to train its coarse and PQ codebooks; below this a flat index is used.
+IVFPQ_MIN_VECTORS = 10_000
+IVFPQ_MAX_TRAIN = 100_000
+PQ_NBITS = 8
+
+# Maps section id -> content hash of what is currently in the saved index
+MANIFEST_NAME = "manifest.json"
+
+# Scalar quantizers store each vector component in fewer bytes: 2 (fp16) or 1 (sq8) instead of 4
+SCALAR_QUANTIZERS = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "sq8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+def iter_sections(uri: str, user: str, password: str, limit: int | None = None) -> Iterator[Document]:
+    """Stream Section nodes from Neo4j as LangChain Documents, one record at a time."""
     driver = GraphDatabase.driver(uri, auth=(user, password))
-    docs: List[Document] = []
     query = (
         "MATCH (s:Section)<-[:HAS_SECTION]-(p:Page) "
         "RETURN s.text AS text, p.url AS url, s.heading AS heading, s.idx AS idx "
         + ("LIMIT $limit" if limit else "")
     )
-    with driver.session() as session:
-        res = session.run(query, limit=limit)
-        for record in res:
-            metadata = {
-                "url": record["url"],
-                "heading": record["heading"],
-                "idx": record["idx"],
-            }
-            docs.append(Document(page_content=record["text"], metadata=metadata))
-    driver.close()
-    return docs
-
-
-def build_faiss_index(docs: List[Document], output_dir: str):
+    try:
+        with driver.session(fetch_size=NEO4J_FETCH_SIZE) as session:
+            for record in session.run(query, limit=limit):
+                metadata = {
+                    "url": record["url"],
+                    "heading": record["heading"],
+                    "idx": record["idx"],
+                }
+                yield Document(page_content=record["text"], metadata=metadata)
+    finally:
+        driver.close()
+
+
+def fetch_sections(uri: str, user: str, password: str, limit: int | None = None) -> List[Document]:
+    """Fetch Section nodes from Neo4j and map them to LangChain Documents."""
+    return list(iter_sections(uri, user, password, limit=limit))
+
+
+def _iter_batches(docs: Iterable[Document], max_items: int, max_tokens: int) -> Iterator[List[Document]]:
+    """Group documents into request-sized batches bounded by item count and token total."""
+    enc = tiktoken.get_encoding("cl100k_base")
+    batch: List[Document] = []
+    batch_tokens = 0
+    for doc in docs:
+        n_tokens = len(enc.encode(doc.page_content, disallowed_special=()))
+        if batch and (len(batch) >= max_items or batch_tokens + n_tokens > max_tokens):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(doc)
+        batch_tokens += n_tokens
+    if batch:
+        yield batch
+
+
+def embed_documents(
+    docs: Iterable[Document],
+    embeddings: Embeddings,
+    batch_size: int = EMBED_BATCH_SIZE,
+    max_tokens: int = EMBED_BATCH_TOKENS,
+) -> Tuple[List[Document], np.ndarray]:
+    """Embed a stream of documents with one API request per batch.
+
+    Each batch is converted to float32 as soon as it is returned, so peak memory is
+    bounded by the stacked matrix rather than by per-float Python objects.
+    Returns the consumed documents and an ``(N, dim)`` float32 matrix in the same order.
+    """
+    kept: List[Document] = []
+    chunks: List[np.ndarray] = []
+    for batch in tqdm(_iter_batches(docs, batch_size, max_tokens), desc="Embedding", unit="batch"):
+        vectors = embeddings.embed_documents([d.page_content for d in batch])
+        chunks.append(np.asarray(vectors, dtype=np.float32))
+        kept.extend(batch)
+    if not chunks:
+        return kept, np.empty((0, 0), dtype=np.float32)
+    return kept, np.vstack(chunks)
+
+
+def _pq_subquantizers(dim: int, target: int = 64) -> int:
+    """Largest divisor of ``dim`` not exceeding ``target`` (PQ requires ``dim % m == 0``)."""
+    return max(m for m in range(1, min(dim, target) + 1) if dim % m == 0)
+
+
+def _build_ivfpq_index(xb: np.ndarray, nprobe: int) -> faiss.Index:
+    """Train an IVF-PQ index on ``xb`` (coarse k-means lists plus 8-bit product quantization)."""
+    n, dim = xb.shape
+    nlist = int(4 * math.sqrt(n))
+    m = _pq_subquantizers(dim)
+    quantizer = faiss.IndexFlatIP(dim)
+    index = faiss.IndexIVFPQ(quantizer, dim, nlist, m, PQ_NBITS, faiss.METRIC_INNER_PRODUCT)
+    logger.info("Training IVF-PQ index (nlist=%d, m=%d) on %d vectors…", nlist, m, min(n, IVFPQ_MAX_TRAIN))
+    sample = xb[np.random.default_rng(0).permutation(n)[:IVFPQ_MAX_TRAIN]]
+    index.train(sample)
+    index.add(xb)
+    index.nprobe = nprobe  # persisted by faiss.write_index
+    return index
+
+
+def _build_scalar_quantized_index(xb: np.ndarray, index_type: str) -> faiss.Index:
+    """Flat (exact-scan) index over scalar-quantized vectors."""
+    index = faiss.IndexScalarQuantizer(xb.shape[1], SCALAR_QUANTIZERS[index_type], faiss.METRIC_INNER_PRODUCT)
+    index.train(xb)  # learns per-dimension ranges; no minimum corpus size
+    index.add(xb)
+    return index
+
+
+def _section_id(doc: Document) -> str:
+    """Stable docstore id for a section, derived from its (page url, heading) key in Neo4j."""
+    key = f"{doc.metadata.get('url')}\0{doc.metadata.get('heading')}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _content_hash(doc: Document) -> str:
+    payload = json.dumps([doc.page_content, doc.metadata], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _index_type(index: faiss.Index) -> str:
+    """Name (as accepted by ``--index-type``) of the kind of index ``index`` is."""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVF):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        for name, qtype in SCALAR_QUANTIZERS.items():
+            if index.sq.qtype == qtype:
+                return name
+    return "flat"
+
+
+def _load_existing(output_dir: str, embeddings: Embeddings) -> Tuple[FAISS | None, Dict[str, str]]:
+    """Load a previously saved index and its manifest, or ``(None, {})`` if either is missing."""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    if not (os.path.exists(manifest_path) and os.path.exists(os.path.join(output_dir, "index.faiss"))):
+        return None, {}
+    with open(manifest_path, encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    store = FAISS.load_local(
+        output_dir,
+        embeddings,
+        allow_dangerous_deserialization=True,
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+    )
+    if store.index.metric_type != faiss.METRIC_INNER_PRODUCT:
+        logger.info("Existing index in %s uses L2 distance; rebuilding with inner product", output_dir)
+        return None, {}
+    logger.info("Loaded existing index with %d sections from %s", len(manifest), output_dir)
+    return store, manifest
+
+
+def _new_store(
+    docs: List[Document], xb: np.ndarray, embeddings: Embeddings, index_type: str, nprobe: int
+) -> FAISS:
+    if index_type == "ivfpq" and len(docs) < IVFPQ_MIN_VECTORS:
+        logger.info("Only %d vectors; IVF-PQ needs %d to train. Using a flat index.", len(docs), IVFPQ_MIN_VECTORS)
+        index_type = "flat"
+
+    if index_type == "ivfpq":
+        faiss_index = _build_ivfpq_index(xb, nprobe)
+    elif index_type in SCALAR_QUANTIZERS:
+        faiss_index = _build_scalar_quantized_index(xb, index_type)
+    else:
+        faiss_index = faiss.IndexFlatIP(xb.shape[1])
+        faiss_index.add(xb)
+
+    # Wire the prebuilt index into LangChain in one pass instead of per-document inserts
+    ids = [_section_id(d) for d in docs]
+    return FAISS(
+        embedding_function=embeddings,
+        index=faiss_index,
+        docstore=InMemoryDocstore(dict(zip(ids, docs))),
+        index_to_docstore_id=dict(enumerate(ids)),
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+    )
+
+
+def _rebuild_ivfpq(
+    store: FAISS,
+    section_ids: Iterable[str],
+    new_docs: List[Document],
+    xb: np.ndarray,
+    embeddings: Embeddings,
+    batch_size: int,
+) -> FAISS:
+    """Retrain an IVF-PQ store over ``new_docs`` plus the sections of ``section_ids`` already in ``store``.
+
+    Unchanged sections are re-embedded through ``embeddings``; only the embedding
+    cache keeps that from calling the API again for each of them.
+    """
+    fresh = {_section_id(d) for d in new_docs}
+    kept_docs = [store.docstore.search(sid) for sid in section_ids if sid not in fresh]
+    kept_docs, kept_xb = embed_documents(kept_docs, embeddings, batch_size=batch_size)
+    if len(kept_xb):
+        faiss.normalize_L2(kept_xb)
+    all_xb = np.vstack([m for m in (kept_xb, xb) if len(m)])
+    nprobe = faiss.extract_index_ivf(store.index).nprobe
+    return _new_store(kept_docs + new_docs, all_xb, embeddings, "ivfpq", nprobe)
+
+
+def build_faiss_index(
+    docs: Iterable[Document],
+    output_dir: str,
+    batch_size: int = EMBED_BATCH_SIZE,
+    cache_path: str | None = None,
+    index_type: str | None = None,
+    nprobe: int = 8,
+    rebuild: bool = False,
+    prune: bool = True,
+) -> int:
+    """Embed ``docs`` and save a FAISS index to ``output_dir``. Returns the number of sections seen.
+
+    If ``output_dir`` already holds an index with a manifest (and ``rebuild`` is false), only
+    new or changed sections are embedded and added; with ``prune`` sections that are no longer
+    in ``docs`` are removed. The index type of an existing index is kept; IVF-PQ indexes are
+    retrained rather than edited when sections change or are removed.
+    """
+    embeddings = OpenAIEmbeddings(chunk_size=batch_size)
+    if cache_path:
+        embeddings = CachedEmbeddings(embeddings, cache_path)
+    store, manifest = (None, {}) if rebuild else _load_existing(output_dir, embeddings)
+
+    seen: Dict[str, str] = {}
+
+    def pending() -> Iterator[Document]:
+        for doc in docs:
+            sid, digest = _section_id(doc), _content_hash(doc)
+            seen[sid] = digest
+            if manifest.get(sid) != digest:
+                yield doc
+
+    logger.info("Generating embeddings…")
+    new_docs, xb = embed_documents(pending(), embeddings, batch_size=batch_size)
+    if not seen:
+        return 0
+    if len(xb):
+        faiss.normalize_L2(xb)  # unit vectors: inner product == cosine similarity
+
+    if store is None:
+        store = _new_store(new_docs, xb, embeddings, index_type or "flat", nprobe)
+        new_manifest = seen
+    else:
+        existing_type = _index_type(store.index)
+        if index_type is not None and index_type != existing_type:
+            logger.warning(
+                "Keeping the existing %s index in %s; --index-type %s only applies with --rebuild",
+                existing_type,
+                output_dir,
+                index_type,
+            )
+        new_ids = [_section_id(d) for d in new_docs]
+        changed = [sid for sid in new_ids if sid in manifest]  # replace their old vectors
+        stale = [sid for sid in manifest if sid not in seen] if prune else []
+        new_manifest = seen if prune else {**manifest, **seen}
+        if existing_type == "ivfpq" and (changed or stale):
+            # IVF remove_ids leaves gaps in the id space, but LangChain's delete renumbers
+            # index_to_docstore_id as if ids were compacted; retrain from scratch instead.
+            logger.info("%d changed and %d removed sections; rebuilding the IVF-PQ index", len(changed), len(stale))
+            if not cache_path:
+                logger.warning(
+                    "No embedding cache: all %d unchanged sections are re-sent to the embeddings API. "
+                    "Drop --no-embedding-cache to avoid this.",
+                    len(new_manifest) - len(new_docs),
+                )
+            store = _rebuild_ivfpq(store, new_manifest, new_docs, xb, embeddings, batch_size)
+        else:
+            if changed or stale:
+                store.delete(changed + stale)
+            if new_docs:
+                store.add_embeddings(
+                    [(d.page_content, v) for d, v in zip(new_docs, xb)],
+                    metadatas=[d.metadata for d in new_docs],
+                    ids=new_ids,
+                )
+            logger.info(
+                "Incremental update: %d added, %d changed, %d removed, %d unchanged",
+                len(new_ids) - len(changed),
+                len(changed),
+                len(stale),
+                len(seen) - len(new_ids),
+            )
+
     os.makedirs(output_dir, exist_ok=True)
-    embeddings = OpenAIEmbeddings()
-    logger.info("Generating embeddings (%d documents)…", len(docs))
-    # progress
-    texts = [d.page_content for d in docs]
-    metadatas = [d.metadata for d in docs]
-    index = FAISS.from_texts(texts=texts, embedding=embeddings, metadatas=metadatas)
-    index.save_local(output_dir)
-    logger.info("Vector index saved to %s", output_dir)
+    store.save_local(output_dir)
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w", encoding="utf-8") as fh:
+        json.dump(new_manifest, fh)
+    logger.info("Vector index with %d sections saved to %s", len(new_manifest), output_dir)
+    return len(seen)
 
 
 def main():
@@ -55,6 +328,26 @@ def main():
     parser.add_argument("--neo4j-password", required=True)
     parser.add_argument("--limit", type=int, default=None, help="Limit number of sections for indexing")
     parser.add_argument("--out", default="vector_index", help="Output directory for FAISS index")
+    parser.add_argument(
+        "--batch-size", type=int, default=EMBED_BATCH_SIZE, help="Maximum sections per embeddings request"
+    )
+    parser.add_argument(
+        "--embedding-cache",
+        default="embedding_cache.sqlite",
+        help="SQLite file caching section embeddings across runs",
+    )
+    parser.add_argument("--no-embedding-cache", action="store_true", help="Always re-embed every section")
+    parser.add_argument(
+        "--index-type",
+        choices=["flat", "fp16", "sq8", "ivfpq"],
+        default=None,
+        help="FAISS index: exact float32 flat search (default), flat search over fp16/int8 scalar-quantized "
+        "vectors, or compressed IVF-PQ for large corpora. An existing index keeps its type unless --rebuild",
+    )
+    parser.add_argument("--nprobe", type=int, default=8, help="IVF lists probed per query (ivfpq only)")
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Ignore any existing index in --out and build from scratch"
+    )
     args = parser.parse_args()
 
     # Ensure API key
@@ -62,12 +355,20 @@ def main():
         logger.error("OPENAI_API_KEY environment variable not set.")
         return
 
-    docs = fetch_sections(args.neo4j_uri, args.neo4j_user, args.neo4j_password, limit=args.limit)
-    if not docs:
+    sections = iter_sections(args.neo4j_uri, args.neo4j_user, args.neo4j_password, limit=args.limit)
+    cache_path = None if args.no_embedding_cache else args.embedding_cache
+    indexed = build_faiss_index(
+        sections,
+        args.out,
+        batch_size=args.batch_size,
+        cache_path=cache_path,
+        index_type=args.index_type,
+        nprobe=args.nprobe,
+        rebuild=args.rebuild,
+        prune=args.limit is None,  # a --limit run only sees part of the graph
+    )
+    if not indexed:
         logger.error("No documents fetched from Neo4j. Has the graph been built?")
-        return
-
-    build_faiss_index(docs, args.out)
 
 
 if __name__ == "__main__":
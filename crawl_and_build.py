@@ -13,18 +13,34 @@ def main():
     parser.add_argument("--neo4j-user", default="neo4j", help="Neo4j username")
     parser.add_argument("--base-url", default="https://www.mosdac.gov.in/", help="Start URL to crawl")
     parser.add_argument("--max-pages", type=int, default=500, help="Maximum number of pages to crawl")
-    parser.add_argument("--delay", type=float, default=0.5, help="Delay between requests (seconds)")
+    parser.add_argument("--delay", type=float, default=0.5, help="Delay between request rounds (seconds)")
+    parser.add_argument("--workers", type=int, default=1, help="Pages fetched concurrently per round")
+    parser.add_argument(
+        "--parse-workers", type=int, default=0, help="Processes used to parse fetched pages (0 = in-process)"
+    )
     parser.add_argument("--no-entities", action="store_true", help="Skip entity extraction/geocoding")
+    parser.add_argument(
+        "--nlp-processes", type=int, default=1, help="spaCy processes for entity extraction (-1 = all cores)"
+    )
     args = parser.parse_args()
 
-    pages = crawl_site(args.base_url, max_pages=args.max_pages, delay=args.delay)
+    pages = crawl_site(
+        args.base_url, max_pages=args.max_pages, delay=args.delay, workers=args.workers, parse_workers=args.parse_workers
+    )
     logging.info("Crawled %d pages. Building knowledge graph…", len(pages))
 
     extractor = None
     if not args.no_entities:
         extractor = EntityExtractor(enable_geocoding=True)
 
-    build_graph(pages, args.neo4j_uri, args.neo4j_user, args.neo4j_password, extractor=extractor)
+    build_graph(
+        pages,
+        args.neo4j_uri,
+        args.neo4j_user,
+        args.neo4j_password,
+        extractor=extractor,
+        n_process=args.nlp_processes,
+    )
     logging.info("Knowledge graph construction completed.")
 
 
@@ -1,3 +1,4 @@
+from importlib import import_module
 from importlib.metadata import version, PackageNotFoundError
 
 try:
@@ -5,14 +6,32 @@ try:
 except PackageNotFoundError:
     __version__ = "0.0.0"
 
-# Re-export core APIs
-from .crawler import crawl_site, Page
-from .graph_builder import build_graph
-from .entities import EntityExtractor
+# Re-export core APIs. Submodules are imported on first attribute access so
+# that e.g. ``import mosdac_bot.qa_engine`` does not pull in spaCy/geopy.
+_EXPORTS = {
+    "crawl_site": ".crawler",
+    "Page": ".crawler",
+    "build_graph": ".graph_builder",
+    "EntityExtractor": ".entities",
+    "CachedEmbeddings": ".embedding_cache",
+}
 
 __all__ = [
     "crawl_site",
     "Page",
     "build_graph",
     "EntityExtractor",
-]
\ No newline at end of file
+    "CachedEmbeddings",
+]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
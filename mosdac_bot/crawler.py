@@ -1,13 +1,20 @@
 import logging
+import multiprocessing
 import re
 import time
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass, field
-from typing import List, Optional, Set
+from functools import partial
+from typing import List, Optional, Set, Tuple
 from urllib.parse import urljoin, urldefrag, urlparse
 
+import lxml.html
 import requests
-from bs4 import BeautifulSoup, NavigableString
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Configure root logger
 logger = logging.getLogger(__name__)
@@ -23,6 +30,13 @@ FILE_EXT_BLACKLIST = re.compile(
     re.IGNORECASE,
 )
 
+SECTION_TAGS = {"p", "li", "span", "div"}
+# Elements whose text is code or markup rather than page content
+NON_CONTENT_TAGS = ("script", "style", "template")
+
+# Feed lxml UTF-8 bytes: it rejects str input that carries an XML encoding declaration
+_HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
 
 @dataclass
 class Section:
@@ -69,12 +83,95 @@ def normalize_url(base_url: str, link: str) -> Optional[str]:
     return link
 
 
+def make_session(pool_size: int = 10) -> requests.Session:
+    """HTTP session with keep-alive pooling sized for ``pool_size`` concurrent fetches and retry with backoff."""
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, 10), max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def fetch_html(session: requests.Session, url: str) -> Optional[str]:
+    """GET ``url`` and return the response body, or ``None`` (logged) on any failure."""
+    logger.info("Fetching %s", url)
+    try:
+        resp = session.get(url, timeout=15)
+        resp.raise_for_status()
+    except Exception as exc:
+        logger.warning("Failed to fetch %s: %s", url, exc)
+        return None
+    return resp.text
+
+
+def _element_text(el, sep: str) -> str:
+    """Whitespace-stripped text of ``el`` and its descendants (comments excluded), joined by ``sep``."""
+    return sep.join(part for part in (txt.strip() for txt in el.itertext()) if part)
+
+
+def parse_page(url: str, html: str, keep_html: bool = False) -> Tuple[Page, List[str]]:
+    """Extract title, heading sections and outgoing ``href`` values from a page.
+
+    The source markup is only kept on ``Page.raw_html`` when ``keep_html`` is set.
+    Text inside ``<script>``, ``<style>`` and ``<template>`` is ignored, and markup
+    with no elements (e.g. only a doctype or a comment) yields an empty page:
+
+    >>> page, links = parse_page("u", "<h1>T</h1><div>Intro <script>track();</script> more</div>"
+    ...                               "<div><style>.a{color:red}</style>Styled</div>")
+    >>> page.sections[0].text
+    'Intro more Styled'
+    >>> parse_page("u", "<!-- a -->")
+    (Page(url='u', title=None, sections=[], raw_html=None), [])
+    """
+    raw_html = html if keep_html else None
+    if not html.strip():
+        return Page(url=url, raw_html=raw_html), []
+    try:
+        tree = lxml.html.document_fromstring(html.encode("utf-8"), parser=_HTML_PARSER)
+    except etree.ParserError:
+        # "Document is empty": nothing but a doctype, comment, PI or CDATA
+        return Page(url=url, raw_html=raw_html), []
+    # Empty the elements rather than removing them so their tails stay separate text nodes
+    for el in list(tree.iter(*NON_CONTENT_TAGS)):
+        el.clear(keep_tail=True)
+    title_el = tree.find(".//title")
+    title = title_el.text.strip() if title_el is not None and title_el.text else None
+
+    # Extract headings (h1-h3) and the text that follows each one up to the next heading
+    sections: List[Section] = []
+    for heading in tree.iter("h1", "h2", "h3"):
+        section_parts: List[str] = [(heading.tail or "").strip()]
+        for sibling in heading.itersiblings():
+            if not isinstance(sibling.tag, str):
+                continue  # comments / processing instructions
+            if sibling.tag.startswith("h"):
+                break  # next section
+            if sibling.tag in SECTION_TAGS:
+                section_parts.append(_element_text(sibling, " "))
+            section_parts.append((sibling.tail or "").strip())
+        paragraph_text = " ".join(part for part in section_parts if part)
+        if paragraph_text:
+            sections.append(Section(heading=_element_text(heading, ""), text=paragraph_text))
+
+    links = [a.get("href") for a in tree.iter("a") if a.get("href") is not None]
+    return Page(url=url, title=title, sections=sections, raw_html=raw_html), links
+
+
 # ---------------------------------------------------------------------------
 # Core crawling routine
 # ---------------------------------------------------------------------------
 
 
-def crawl_site(base_url: str, max_pages: int = 500, delay: float = 0.5) -> List[Page]:
+def crawl_site(
+    base_url: str,
+    max_pages: int = 500,
+    delay: float = 0.5,
+    workers: int = 1,
+    parse_workers: int = 0,
+    keep_html: bool = False,
+) -> List[Page]:
     """Breadth-first crawl of the MOSDAC website.
 
     Parameters
@@ -84,64 +181,60 @@ def crawl_site(base_url: str, max_pages: int = 500, delay: float = 0.5) -> List[
     max_pages : int, optional
         Maximum number of pages to crawl. Defaults to 500.
     delay : float, optional
-        Delay between requests in seconds, to be polite. Defaults to 0.5.
+        Delay between request rounds in seconds, to be polite. Defaults to 0.5.
+    workers : int, optional
+        Number of pages fetched concurrently per round. Defaults to 1 (sequential).
+    parse_workers : int, optional
+        Size of a process pool used to parse each round's pages off the main
+        interpreter. Defaults to 0 (parse in-process); only useful with ``workers > 1``.
+        Workers are spawned, so scripts using it need an ``if __name__ == "__main__"`` guard.
+    keep_html : bool, optional
+        Retain each page's source markup on ``Page.raw_html``. Defaults to False,
+        since nothing downstream needs it and it dominates crawl memory.
 
     Returns
     -------
     List[Page]
         Pages with extracted content (title, headings, body text).
     """
-    visited: Set[str] = set()
+    # URLs already queued or rejected; checked at enqueue time so the frontier never holds duplicates
+    seen: Set[str] = {base_url}
     queue: deque[str] = deque([base_url])
     pages: List[Page] = []
     netloc = urlparse(base_url).netloc
 
-    session = requests.Session()
-    session.headers.update(DEFAULT_HEADERS)
-
-    while queue and len(pages) < max_pages:
-        url = queue.popleft()
-        if url in visited:
-            continue
-        visited.add(url)
-        logger.info("Fetching %s", url)
-        try:
-            resp = session.get(url, timeout=15)
-            resp.raise_for_status()
-        except Exception as exc:
-            logger.warning("Failed to fetch %s: %s", url, exc)
-            continue
-
-        soup = BeautifulSoup(resp.text, "lxml")
-        title = soup.title.string.strip() if soup.title and soup.title.string else None
-
-        # Extract headings (h1-h3) and associated paragraphs
-        sections: List[Section] = []
-        for heading_tag in soup.find_all(["h1", "h2", "h3"]):
-            heading_text = heading_tag.get_text(strip=True)
-            section_parts: List[str] = []
-            for sibling in heading_tag.next_siblings:
-                if sibling.name and sibling.name.startswith("h"):
-                    break  # next section
-                if isinstance(sibling, NavigableString):
-                    section_parts.append(sibling.strip())
-                elif sibling.name in ["p", "li", "span", "div"]:
-                    section_parts.append(sibling.get_text(" ", strip=True))
-            paragraph_text = " ".join(part for part in section_parts if part)
-            if paragraph_text:
-                sections.append(Section(heading=heading_text, text=paragraph_text))
-
-        page = Page(url=url, title=title, sections=sections, raw_html=resp.text)
-        pages.append(page)
-
-        # Find new links to follow
-        for link_tag in soup.find_all("a", href=True):
-            link_url = normalize_url(url, link_tag["href"])
-            if not link_url:
-                continue
-            if is_same_domain(netloc, link_url) and link_url not in visited:
-                queue.append(link_url)
-
-        time.sleep(delay)
-
-    return pages
\ No newline at end of file
+    session = make_session(pool_size=workers)
+
+    parse = partial(parse_page, keep_html=keep_html)
+    # Spawn rather than fork: the pool starts while fetch threads are alive
+    parse_ctx = (
+        ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context("spawn"))
+        if parse_workers > 0
+        else nullcontext()
+    )
+    with ThreadPoolExecutor(max_workers=workers) as pool, parse_ctx as parse_pool:
+        while queue and len(pages) < max_pages:
+            # Fetch a round of URLs in parallel; results are handled in BFS order
+            batch = [queue.popleft() for _ in range(min(workers, len(queue), max_pages - len(pages)))]
+            htmls = pool.map(partial(fetch_html, session), batch)
+            fetched = [(u, html) for u, html in zip(batch, htmls) if html is not None]
+            if parse_pool is not None and fetched:
+                parsed = parse_pool.map(parse, *zip(*fetched))
+            else:
+                parsed = (parse(u, html) for u, html in fetched)
+
+            for page, hrefs in parsed:
+                pages.append(page)
+
+                # Find new links to follow
+                for href in hrefs:
+                    link_url = normalize_url(page.url, href)
+                    if not link_url or link_url in seen:
+                        continue
+                    seen.add(link_url)
+                    if is_same_domain(netloc, link_url):
+                        queue.append(link_url)
+
+            time.sleep(delay)
+
+    return pages
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# SQLite's default limit on bound parameters is 999 on older builds.
+_LOOKUP_CHUNK = 500
+
+
+class CachedEmbeddings(Embeddings):
+    """Wrap an `Embeddings` backend with a persistent SQLite cache keyed by content hash.
+
+    Vectors are stored as float32 blobs under ``blake2b(namespace + text)``; the
+    namespace defaults to the wrapped model name so switching models never
+    returns stale vectors.
+    """
+
+    def __init__(self, underlying: Embeddings, cache_path: str, namespace: str | None = None):
+        self.underlying = underlying
+        self.namespace = namespace if namespace is not None else str(getattr(underlying, "model", ""))
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Embeddings interface
+    # ------------------------------------------------------------------
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        cached = self._lookup(keys)
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if missing:
+            logger.debug("Embedding cache: %d hits, %d misses", len(texts) - len(missing), len(missing))
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors))
+            self._store(fresh)
+            cached.update(fresh)
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        cached = self._lookup([key])
+        if key in cached:
+            return cached[key]
+        vector = self.underlying.embed_query(text)
+        self._store({key: vector})
+        return vector
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.namespace.encode())
+        digest.update(b"\0")
+        digest.update(text.encode())
+        return digest.hexdigest()
+
+    def _lookup(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        unique = list(dict.fromkeys(keys))
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for start in range(0, len(unique), _LOOKUP_CHUNK):
+                chunk = unique[start : start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                )
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def _store(self, vectors: Dict[str, List[float]]):
+        rows = [(key, array("f", vector).tobytes()) for key, vector in vectors.items()]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+            self._conn.commit()
@@ -3,16 +3,33 @@ from __future__ import annotations
 import functools
 import logging
 from dataclasses import dataclass
-from typing import List, Set
+from typing import Dict, Iterable, Iterator, List
 
 import spacy
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderServiceError
+from geopy.extra.rate_limiter import RateLimiter
 from spacy.matcher import PhraseMatcher
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Pipeline components the extractor never reads; they are not loaded at all.
+# NER and the phrase matcher only need tokens. In en_core_web_sm the shared
+# tok2vec feeds only tagger and parser, while ner embeds with its own copy.
+_UNUSED_COMPONENTS = ["tok2vec", "tagger", "parser", "lemmatizer", "attribute_ruler"]
+
+
+@functools.lru_cache(maxsize=None)
+def _load_spacy_model(name: str):
+    """Load a spaCy pipeline once per process; all extractors share the same instance."""
+    logger.info("Loading spaCy model '%s'…", name)
+    try:
+        return spacy.load(name, exclude=_UNUSED_COMPONENTS)
+    except OSError:
+        logger.error("spaCy model '%s' not found. Please run: python -m spacy download %s", name, name)
+        raise
+
 
 @dataclass
 class Entity:
@@ -51,19 +68,13 @@ class EntityExtractor:
 
     def __init__(self, enable_geocoding: bool = True):
         self.enable_geocoding = enable_geocoding
-        logger.info("Loading spaCy model 'en_core_web_sm'…")
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            logger.error(
-                "spaCy model 'en_core_web_sm' not found. Please run: python -m spacy download en_core_web_sm"
-            )
-            raise
-
-        # Build custom phrase matcher for satellites and instruments
+        self.nlp = _load_spacy_model("en_core_web_sm")
+
+        # Build custom phrase matcher for satellites and instruments. Patterns are
+        # streamed through the tokenizer rather than tokenized one call at a time.
         self.matcher = PhraseMatcher(self.nlp.vocab, attr="LOWER")
-        self.matcher.add("SATELLITE", [self.nlp.make_doc(term) for term in self.SATELLITE_TERMS])
-        self.matcher.add("INSTRUMENT", [self.nlp.make_doc(term) for term in self.INSTRUMENT_TERMS])
+        self.matcher.add("SATELLITE", list(self.nlp.tokenizer.pipe(self.SATELLITE_TERMS)))
+        self.matcher.add("INSTRUMENT", list(self.nlp.tokenizer.pipe(self.INSTRUMENT_TERMS)))
 
         # Setup geocoder
         self._geocode = self._make_geocoder() if enable_geocoding else lambda name: (None, None)
@@ -73,7 +84,45 @@ class EntityExtractor:
     # ------------------------------------------------------------------
 
     def extract(self, text: str) -> List[Entity]:
-        doc = self.nlp(text)
+        entities = self._entities_from_doc(self.nlp(text))
+        self.resolve_locations(entities)
+        return entities
+
+    def extract_many(
+        self,
+        texts: Iterable[str],
+        n_process: int = 1,
+        batch_size: int = 64,
+        geocode: bool = True,
+    ) -> Iterator[List[Entity]]:
+        """Stream `texts` through spaCy in batches, yielding one entity list per text in order.
+
+        ``n_process > 1`` (or ``-1`` for all cores) forks spaCy worker processes,
+        each holding its own copy of the model; avoid it from multithreaded code
+        and when running spaCy on a GPU. With ``geocode=False`` locations are
+        yielded without coordinates so callers can batch `resolve_locations`.
+        """
+        docs = self.nlp.pipe(texts, n_process=n_process, batch_size=batch_size)
+        for doc in docs:
+            entities = self._entities_from_doc(doc)
+            if geocode:
+                self.resolve_locations(entities)
+            yield entities
+
+    def resolve_locations(self, entities: Iterable[Entity]):
+        """Fill in coordinates of LOCATION entities in place, geocoding each distinct name once."""
+        if not self.enable_geocoding:
+            return
+        locations = [ent for ent in entities if ent.label == "LOCATION" and ent.latitude is None]
+        coords = {name: self._geocode(name) for name in dict.fromkeys(ent.text for ent in locations)}
+        for ent in locations:
+            ent.latitude, ent.longitude = coords[ent.text]
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _entities_from_doc(self, doc) -> List[Entity]:
         entities: List[Entity] = []
 
         # Custom phrase matcher
@@ -86,31 +135,24 @@ class EntityExtractor:
         # Built-in NER for locations
         for ent in doc.ents:
             if ent.label_ in {"GPE", "LOC", "FAC"}:
-                lat, lon = self._geocode(ent.text) if self.enable_geocoding else (None, None)
-                entities.append(Entity(text=ent.text, label="LOCATION", latitude=lat, longitude=lon))
+                entities.append(Entity(text=ent.text, label="LOCATION"))
 
-        # Deduplicate by (text, label)
-        seen: Set[tuple[str, str]] = set()
-        deduped: List[Entity] = []
+        # Deduplicate by (text, label), keeping the first occurrence
+        unique: Dict[tuple[str, str], Entity] = {}
         for ent in entities:
-            key = (ent.text.lower(), ent.label)
-            if key not in seen:
-                seen.add(key)
-                deduped.append(ent)
-        return deduped
-
-    # ------------------------------------------------------------------
-    # Internal helpers
-    # ------------------------------------------------------------------
+            unique.setdefault((ent.text.lower(), ent.label), ent)
+        return list(unique.values())
 
     @staticmethod
     def _make_geocoder():
         geolocator = Nominatim(user_agent="mosdac_bot_geocoder", timeout=10)
+        # Nominatim's usage policy allows at most one request per second
+        rate_limited = RateLimiter(geolocator.geocode, min_delay_seconds=1, swallow_exceptions=False)
 
         @functools.lru_cache(maxsize=512)
         def _geocode(name: str):
             try:
-                loc = geolocator.geocode(name)
+                loc = rate_limited(name)
                 if loc:
                     return loc.latitude, loc.longitude
             except GeocoderServiceError as e:
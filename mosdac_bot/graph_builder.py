@@ -1,26 +1,44 @@
 from __future__ import annotations
 
 import logging
-from typing import List
-
-from neo4j import GraphDatabase
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, List
 
 from .crawler import Page, Section
 from .entities import EntityExtractor, Entity
+from .neo4j_pool import get_driver
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Pages written per transaction; each batch is a handful of UNWIND queries and one commit.
+DEFAULT_BATCH_SIZE = 1000
+# Batches committed concurrently, each on its own session.
+DEFAULT_WRITE_WORKERS = 4
+
 
 class KnowledgeGraphBuilder:
     """Utility class to push scraped MOSDAC content into Neo4j as a knowledge graph."""
 
-    def __init__(self, uri: str, user: str, password: str, extractor: EntityExtractor | None = None):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+    def __init__(
+        self,
+        uri: str,
+        user: str,
+        password: str,
+        extractor: EntityExtractor | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        write_workers: int = DEFAULT_WRITE_WORKERS,
+        n_process: int = 1,
+    ):
+        self.driver = get_driver(uri, user, password)
         self.extractor = extractor
+        self.batch_size = batch_size
+        self.write_workers = write_workers
+        self.n_process = n_process
 
     def close(self):
-        self.driver.close()
+        """Kept for API compatibility; the Neo4j driver is shared and closed at exit by `neo4j_pool`."""
 
     # ---------------------------------------------------------------------
     # Public API
@@ -28,13 +46,45 @@ class KnowledgeGraphBuilder:
 
     def build_from_pages(self, pages: List[Page]):
         """Ingest a list of `Page` objects into the graph."""
+        # Schema must exist before concurrent MERGEs rely on it
         with self.driver.session() as session:
             session.execute_write(self._create_constraints)
-            for page in pages:
-                session.execute_write(self._create_page_node, page)
-                if self.extractor:
-                    entities = self.extractor.extract(page.combined_text)
-                    session.execute_write(self._attach_entities, page.url, entities)
+
+        batches = self._prepare_batches(pages)
+        if self.extractor and self.n_process != 1:
+            # spaCy forks its workers; do all extraction before any writer thread exists
+            batches = list(batches)
+
+        # Otherwise extraction stays on this thread and commits overlap on the worker pool.
+        # At most `write_workers` batches are in flight, so a failed commit stops the build
+        # before further batches are extracted and geocoded.
+        workers = max(1, self.write_workers)
+        in_flight: deque[Future] = deque()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for page_rows, page_entities in batches:
+                if len(in_flight) >= workers:
+                    in_flight.popleft().result()
+                in_flight.append(pool.submit(self._commit_batch, page_rows, page_entities))
+            while in_flight:
+                in_flight.popleft().result()
+
+    def _prepare_batches(self, pages: List[Page]) -> Iterator[tuple[list[dict], list[tuple[str, list[Entity]]]]]:
+        for start in range(0, len(pages), self.batch_size):
+            batch = pages[start : start + self.batch_size]
+            page_rows = [self._page_row(page) for page in batch]
+            page_entities: list[tuple[str, list[Entity]]] = []
+            if self.extractor:
+                texts = [page.combined_text for page in batch]
+                mentions = list(self.extractor.extract_many(texts, n_process=self.n_process, geocode=False))
+                # One geocode per distinct place name across the batch
+                self.extractor.resolve_locations(ent for entities in mentions for ent in entities)
+                page_entities = list(zip((page.url for page in batch), mentions))
+            yield page_rows, page_entities
+
+    def _commit_batch(self, page_rows: list[dict], page_entities: list[tuple[str, list[Entity]]]):
+        # Pages, sections and mentions for the batch share one commit
+        with self.driver.session() as session:
+            session.execute_write(self._write_batch, page_rows, page_entities)
 
     # ---------------------------------------------------------------------
     # Static transaction functions
@@ -42,92 +92,116 @@ class KnowledgeGraphBuilder:
 
     @staticmethod
     def _create_constraints(tx):
-        tx.run("CREATE CONSTRAINT IF NOT EXISTS ON (p:Page) ASSERT p.url IS UNIQUE")
-        tx.run("CREATE CONSTRAINT IF NOT EXISTS ON (s:Section) ASSERT (s.page_url, s.heading) IS UNIQUE")
-        tx.run("CREATE CONSTRAINT IF NOT EXISTS ON (sat:Satellite) ASSERT sat.name IS UNIQUE")
-        tx.run("CREATE CONSTRAINT IF NOT EXISTS ON (inst:Instrument) ASSERT inst.name IS UNIQUE")
-        tx.run("CREATE CONSTRAINT IF NOT EXISTS ON (loc:Location) ASSERT loc.name IS UNIQUE")
+        # Neo4j 5 schema syntax; the unique constraints also back the MERGE lookups
+        tx.run("CREATE CONSTRAINT page_url_unique IF NOT EXISTS FOR (p:Page) REQUIRE p.url IS UNIQUE")
+        tx.run(
+            "CREATE CONSTRAINT section_key_unique IF NOT EXISTS "
+            "FOR (s:Section) REQUIRE (s.page_url, s.heading) IS UNIQUE"
+        )
+        tx.run("CREATE CONSTRAINT satellite_name_unique IF NOT EXISTS FOR (sat:Satellite) REQUIRE sat.name IS UNIQUE")
+        tx.run("CREATE CONSTRAINT instrument_name_unique IF NOT EXISTS FOR (inst:Instrument) REQUIRE inst.name IS UNIQUE")
+        tx.run("CREATE CONSTRAINT location_name_unique IF NOT EXISTS FOR (loc:Location) REQUIRE loc.name IS UNIQUE")
+        tx.run("CREATE INDEX section_page_url_index IF NOT EXISTS FOR (s:Section) ON (s.page_url)")
         tx.run("CREATE POINT INDEX location_point_index IF NOT EXISTS FOR (l:Location) ON (l.location)")
 
+    @classmethod
+    def _write_batch(cls, tx, page_rows: list[dict], page_entities: list[tuple[str, list[Entity]]]):
+        cls._create_page_nodes(tx, page_rows)
+        if page_entities:
+            cls._attach_entities(tx, page_entities)
+
     @staticmethod
-    def _create_page_node(tx, page: Page):
-        logger.debug("Creating Page node for %s", page.url)
-        # Create the page node
+    def _page_row(page: Page) -> dict:
+        return {
+            "url": page.url,
+            "title": page.title or "",
+            "sections": [
+                {"heading": section.heading, "text": section.text, "idx": idx}
+                for idx, section in enumerate(page.sections)
+            ],
+        }
+
+    @staticmethod
+    def _create_page_nodes(tx, rows: list[dict]):
+        logger.debug("Creating %d Page nodes", len(rows))
+        # Pages and their sections for the whole batch in a single round-trip
         tx.run(
-            "MERGE (p:Page {url: $url}) "
-            "SET p.title = $title",
-            url=page.url,
-            title=page.title or "",
+            "UNWIND $pages AS page "
+            "MERGE (p:Page {url: page.url}) "
+            "SET p.title = page.title "
+            "WITH p, page "
+            "UNWIND page.sections AS section "
+            "MERGE (s:Section {page_url: page.url, heading: section.heading}) "
+            "SET s.text = section.text, s.idx = section.idx "
+            "MERGE (p)-[:HAS_SECTION]->(s)",
+            pages=rows,
         )
 
-        # Create Section nodes and relationships
-        for idx, section in enumerate(page.sections):
-            tx.run(
-                "MERGE (s:Section {page_url: $page_url, heading: $heading}) "
-                "SET s.text = $text, s.idx = $idx "
-                "WITH s "
-                "MATCH (p:Page {url: $page_url}) "
-                "MERGE (p)-[:HAS_SECTION]->(s)",
-                page_url=page.url,
-                heading=section.heading,
-                text=section.text,
-                idx=idx,
-            )
-
     # ---------------------------------------------------------------------
-    # Entity attachment transaction
+    # Entity attachment
     # ---------------------------------------------------------------------
 
     @staticmethod
-    def _attach_entities(tx, page_url: str, entities: list[Entity]):
-        for ent in entities:
-            if ent.label == "SATELLITE":
-                tx.run(
-                    "MERGE (e:Satellite {name: $name}) "
-                    "WITH e MATCH (p:Page {url: $page_url}) "
-                    "MERGE (p)-[:MENTIONS]->(e)",
-                    name=ent.text,
-                    page_url=page_url,
-                )
-            elif ent.label == "INSTRUMENT":
-                tx.run(
-                    "MERGE (e:Instrument {name: $name}) "
-                    "WITH e MATCH (p:Page {url: $page_url}) "
-                    "MERGE (p)-[:MENTIONS]->(e)",
-                    name=ent.text,
-                    page_url=page_url,
-                )
-            elif ent.label == "LOCATION":
-                params = {
-                    "name": ent.text,
-                    "page_url": page_url,
-                    "latitude": ent.latitude,
-                    "longitude": ent.longitude,
-                }
-                if ent.latitude is not None and ent.longitude is not None:
-                    query = (
-                        "MERGE (e:Location {name: $name}) "
-                        "SET e.location = point({latitude: $latitude, longitude: $longitude}) "
-                        "WITH e MATCH (p:Page {url: $page_url}) "
-                        "MERGE (p)-[:MENTIONS]->(e)"
-                    )
-                else:
-                    query = (
-                        "MERGE (e:Location {name: $name}) "
-                        "WITH e MATCH (p:Page {url: $page_url}) "
-                        "MERGE (p)-[:MENTIONS]->(e)"
-                    )
-                tx.run(query, **params)
+    def _attach_entities(tx, page_entities: list[tuple[str, list[Entity]]]):
+        sats, insts, locs_geo, locs_plain = [], [], [], []
+        for page_url, entities in page_entities:
+            for ent in entities:
+                row = {"name": ent.text, "page_url": page_url}
+                if ent.label == "SATELLITE":
+                    sats.append(row)
+                elif ent.label == "INSTRUMENT":
+                    insts.append(row)
+                elif ent.label == "LOCATION":
+                    if ent.latitude is not None and ent.longitude is not None:
+                        locs_geo.append({**row, "latitude": ent.latitude, "longitude": ent.longitude})
+                    else:
+                        locs_plain.append(row)
+
+        # One round-trip per label group for the whole batch rather than per entity.
+        # Rows are sorted by name so concurrent batches lock shared nodes in the same order.
+        for rows in (sats, insts, locs_geo, locs_plain):
+            rows.sort(key=lambda row: row["name"])
+        queries = (
+            (sats, "MERGE (e:Satellite {name: r.name}) "),
+            (insts, "MERGE (e:Instrument {name: r.name}) "),
+            (
+                locs_geo,
+                "MERGE (e:Location {name: r.name}) "
+                "SET e.location = point({latitude: r.latitude, longitude: r.longitude}) ",
+            ),
+            (locs_plain, "MERGE (e:Location {name: r.name}) "),
+        )
+        for rows, merge in queries:
+            if not rows:
+                continue
+            tx.run(
+                "UNWIND $rows AS r " + merge + "WITH e, r MATCH (p:Page {url: r.page_url}) MERGE (p)-[:MENTIONS]->(e)",
+                rows=rows,
+            )
 
     # ---------------------------------------------------------------------
     # Convenience wrapper
     # ---------------------------------------------------------------------
 
 
-def build_graph(pages: List[Page], uri: str, user: str, password: str, extractor: EntityExtractor | None = None):
-    """High-level helper to build a knowledge graph and automatically close the driver."""
-    builder = KnowledgeGraphBuilder(uri, user, password, extractor=extractor)
-    try:
-        builder.build_from_pages(pages)
-    finally:
-        builder.close()
\ No newline at end of file
+def build_graph(
+    pages: List[Page],
+    uri: str,
+    user: str,
+    password: str,
+    extractor: EntityExtractor | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    write_workers: int = DEFAULT_WRITE_WORKERS,
+    n_process: int = 1,
+):
+    """High-level helper to build a knowledge graph from ``pages`` in one call."""
+    builder = KnowledgeGraphBuilder(
+        uri,
+        user,
+        password,
+        extractor=extractor,
+        batch_size=batch_size,
+        write_workers=write_workers,
+        n_process=n_process,
+    )
+    builder.build_from_pages(pages)
\ No newline at end of file
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+from typing import Dict, Tuple
+
+from neo4j import Driver, GraphDatabase
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MAX_CONNECTION_POOL_SIZE = 50
+CONNECTION_ACQUISITION_TIMEOUT = 60  # seconds
+
+_drivers: Dict[Tuple[str, str, str | None], Driver] = {}
+_lock = threading.Lock()
+
+
+def get_driver(uri: str, user: str, password: str | None) -> Driver:
+    """Return a process-wide driver for ``uri`` so callers share one Bolt connection pool.
+
+    Drivers are closed at interpreter exit; callers must not close them.
+    """
+    key = (uri, user, password)
+    with _lock:
+        driver = _drivers.get(key)
+        if driver is None:
+            logger.debug("Opening Neo4j driver for %s", uri)
+            driver = GraphDatabase.driver(
+                uri,
+                auth=(user, password),
+                max_connection_pool_size=MAX_CONNECTION_POOL_SIZE,
+                connection_acquisition_timeout=CONNECTION_ACQUISITION_TIMEOUT,
+            )
+            _drivers[key] = driver
+        return driver
+
+
+@atexit.register
+def close_drivers():
+    with _lock:
+        for driver in _drivers.values():
+            driver.close()
+        _drivers.clear()
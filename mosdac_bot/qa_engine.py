@@ -1,20 +1,29 @@
 from __future__ import annotations
 
-import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any
 
+import faiss
+import numpy as np
 import openai
+import tiktoken
+from langchain_core.documents import Document
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 
-from neo4j import GraphDatabase
+from .embedding_cache import CachedEmbeddings
+from .neo4j_pool import get_driver
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Retrieved passages and facts kept in the prompt, measured in model tokens.
+CONTEXT_TOKEN_BUDGET = 3000
+
 
 class QABot:
     """Retrieval-augmented Q&A engine over MOSDAC knowledge graph and FAISS index."""
@@ -26,30 +35,105 @@ class QABot:
         neo4j_password: str | None = None,
         vector_index_dir: str = "vector_index",
         openai_model: str = "gpt-3.5-turbo",
+        nprobe: int | None = None,
+        use_gpu: bool = False,
+        embedding_cache: str | None = None,
     ):
-        self._driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
+        self._driver = get_driver(neo4j_uri, neo4j_user, neo4j_password)
         index_path = Path(vector_index_dir)
         if not index_path.exists():
             raise RuntimeError(
                 f"Vector index directory '{vector_index_dir}' not found. Run build_vector_index.py first."
             )
         self._embedding = OpenAIEmbeddings()
+        if embedding_cache:
+            # Repeated questions skip the OpenAI round-trip
+            self._embedding = CachedEmbeddings(self._embedding, embedding_cache)
         self._vector_store = FAISS.load_local(index_path.as_posix(), self._embedding, allow_dangerous_deserialization=True)
+        if self._vector_store.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            # Built over unit-normalized vectors; OpenAI query embeddings are unit length too
+            self._vector_store.distance_strategy = DistanceStrategy.MAX_INNER_PRODUCT
+        self._configure_index(nprobe, use_gpu)
         self._openai_model = openai_model
+        try:
+            self._encoding = tiktoken.encoding_for_model(openai_model)
+        except KeyError:
+            self._encoding = tiktoken.get_encoding("cl100k_base")
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     def answer(self, question: str, chat_history: List[Dict[str, str]] | None = None, top_k: int = 4) -> str:
-        # 1. Retrieve relevant passages
-        docs = self._vector_store.similarity_search(question, k=top_k)
+        return self.answer_many([question], chat_history=chat_history, top_k=top_k)[0]
+
+    def answer_many(
+        self,
+        questions: List[str],
+        chat_history: List[Dict[str, str]] | None = None,
+        top_k: int = 4,
+        max_workers: int = 4,
+    ) -> List[str]:
+        """Answer several independent questions, sharing one embedding call and one FAISS search."""
+        if not questions:
+            return []
+
+        # 1. Retrieve relevant passages for all questions at once
+        docs_per_question = self._retrieve_many(questions, top_k)
 
-        # 2. Gather structured facts from Neo4j for referenced pages
-        page_urls = {doc.metadata.get("url") for doc in docs if doc.metadata.get("url")}
-        facts = self._fetch_facts(page_urls)
+        # 2. Gather structured facts from Neo4j for referenced pages, in one query
+        url_sets = [{doc.metadata.get("url") for doc in docs if doc.metadata.get("url")} for docs in docs_per_question]
+        facts_per_question = self._fetch_facts(url_sets)
+
+        # 3. Compose a prompt per question
+        prompts = [
+            self._compose_messages(question, docs, facts, chat_history)
+            for question, docs, facts in zip(questions, docs_per_question, facts_per_question)
+        ]
+
+        # 4. Completions are network-bound, so issue them concurrently
+        if len(prompts) == 1:
+            return [self._complete(prompts[0])]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(prompts))) as pool:
+            return list(pool.map(self._complete, prompts))
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
 
-        # 3. Compose prompt
+    def _configure_index(self, nprobe: int | None, use_gpu: bool):
+        # The index type (flat / fp16 / sq8 / ivfpq) is chosen by build_vector_index.py;
+        # only query-time knobs are adjusted here.
+        index = self._vector_store.index
+        if nprobe is not None:
+            try:
+                faiss.extract_index_ivf(index).nprobe = nprobe
+            except RuntimeError:
+                logger.warning("nprobe=%d ignored: vector index is not an IVF index", nprobe)
+        if use_gpu:
+            if hasattr(faiss, "index_cpu_to_all_gpus") and faiss.get_num_gpus() > 0:
+                self._vector_store.index = faiss.index_cpu_to_all_gpus(index)
+                logger.info("Vector index moved to %d GPU(s)", faiss.get_num_gpus())
+            else:
+                logger.warning("use_gpu requested but no faiss GPU support is available; staying on CPU")
+
+    def _retrieve_many(self, questions: List[str], top_k: int) -> List[List[Document]]:
+        vectors = np.asarray(self._embedding.embed_documents(questions), dtype="float32")
+        _, indices = self._vector_store.index.search(vectors, top_k)
+        store = self._vector_store
+        results: List[List[Document]] = []
+        for row in indices:
+            # FAISS pads with -1 when fewer than top_k vectors are available
+            results.append([store.docstore.search(store.index_to_docstore_id[i]) for i in row if i != -1])
+        return results
+
+    def _compose_messages(
+        self,
+        question: str,
+        docs: List[Document],
+        facts: List[str],
+        chat_history: List[Dict[str, str]] | None,
+    ) -> List[Dict[str, str]]:
         context_parts: List[str] = []
         for i, doc in enumerate(docs, 1):
             heading = doc.metadata.get("heading", "")
@@ -58,7 +142,7 @@ class QABot:
         if facts:
             context_parts.append("\n[Structured Facts]\n" + "\n".join(facts))
 
-        context = "\n\n".join(context_parts)[-4000:]
+        context = self._trim_context(context_parts, CONTEXT_TOKEN_BUDGET)
 
         system_prompt = (
             "You are an intelligent assistant for the MOSDAC satellite data portal. "
@@ -72,39 +156,61 @@ class QABot:
                 messages.append(msg)
         messages.append({"role": "system", "content": f"Context:\n{context}"})
         messages.append({"role": "user", "content": question})
+        return messages
+
+    def _trim_context(self, parts: List[str], budget: int) -> str:
+        # Keep the tail of the context (facts come last), as whole parts where possible
+        selected: List[str] = []
+        remaining = budget
+        for part in reversed(parts):
+            tokens = self._encoding.encode(part, disallowed_special=())
+            if len(tokens) <= remaining:
+                selected.append(part)
+                remaining -= len(tokens)
+                continue
+            if remaining > 0:
+                selected.append(self._encoding.decode(tokens[-remaining:]))
+            break
+        return "\n\n".join(reversed(selected))
+
+    def _complete(self, messages: List[Dict[str, str]]) -> str:
+        if logger.isEnabledFor(logging.DEBUG):
+            # Tokenizing the whole prompt is not free; only do it when the line is emitted
+            logger.debug(
+                "Prompt tokens: %d",
+                sum(len(self._encoding.encode(msg["content"], disallowed_special=())) for msg in messages),
+            )
 
-        logger.debug("Prompt tokens: %d", len(json.dumps(messages)))
-
-        completion = openai.ChatCompletion.create(
+        completion = openai.chat.completions.create(
             model=self._openai_model,
             messages=messages,
             temperature=0.2,
             max_tokens=512,
         )
-        answer_text = completion.choices[0].message.content.strip()
-        return answer_text
-
-    # ------------------------------------------------------------------
-    # Internal helpers
-    # ------------------------------------------------------------------
+        return completion.choices[0].message.content.strip()
 
-    def _fetch_facts(self, page_urls: set[str]) -> List[str]:
-        if not page_urls:
-            return []
+    def _fetch_facts(self, url_sets: List[set[str]]) -> List[List[str]]:
+        """Return the entity facts for each set of page URLs, using one Cypher query for all sets."""
+        facts: List[List[str]] = [[] for _ in url_sets]
+        queries = [{"qid": qid, "urls": list(urls)} for qid, urls in enumerate(url_sets) if urls]
+        if not queries:
+            return facts
         query = (
-            "MATCH (p:Page)-[:HAS_SECTION]->(s) WHERE p.url IN $urls "
+            "UNWIND $queries AS q "
+            "MATCH (p:Page)-[:HAS_SECTION]->(s) WHERE p.url IN q.urls "
             "OPTIONAL MATCH (p)-[:MENTIONS]->(e) "
-            "RETURN DISTINCT p.url AS url, collect(distinct e.name) AS entities"
+            "RETURN q.qid AS qid, p.url AS url, collect(distinct e.name) AS entities"
         )
         with self._driver.session() as session:
-            res = session.run(query, urls=list(page_urls))
-            facts: List[str] = []
+            res = session.run(query, queries=queries)
             for record in res:
                 url = record["url"]
                 entities = [e for e in record["entities"] if e]
                 if entities:
-                    facts.append(f"Page {url} mentions: {', '.join(entities)}")
+                    facts[record["qid"]].append(f"Page {url} mentions: {', '.join(entities)}")
             return facts
 
     def close(self):
-        self._driver.close()
\ No newline at end of file
+        # The Neo4j driver is shared process-wide and closed at exit by neo4j_pool
+        if isinstance(self._embedding, CachedEmbeddings):
+            self._embedding.close()
\ No newline at end of file